@@ -0,0 +1,106 @@
+from itertools import chain
+from math import ceil, sqrt
+import os
+import pickle
+import subprocess
+import sys
+import traceback
+
+CHARTS_LOG = "charts.log"
+CHOICE_LIMIT = 5
+CHOICE_LABELS = ["1st","2nd","3rd","4th","5th"]
+
+def choicehist(students, course, limit):
+    # how many students had this course as their 1st, 2nd, 3rd choice?
+    return [
+        (students[course] == rank).sum()
+        for rank in range(1,limit+1)
+    ]
+
+def chart_summary(students, courses):
+    # just what the charts need, small enough to send to another process
+    return {
+        "choice_histograms": {
+            course: [int(n) for n in choicehist(students, course, CHOICE_LIMIT)]
+            for course in courses.index
+        },
+        "happiness": students["happiness"].to_numpy(dtype=int),
+    }
+
+def render_charts(summary, coursehist_file="coursehist.png", happiness_file="happiness.png"):
+    # imported here so the backend is set before pyplot loads
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    choice_histograms = summary["choice_histograms"]
+    n_courses = len(choice_histograms)
+    ncols = max(ceil(sqrt(n_courses)), 1)
+    nrows = max(ceil(n_courses/ncols), 1)
+    fig, axes = plt.subplots(nrows,ncols,figsize=(5*ncols,5*nrows),squeeze=False)
+    axes=axes.flatten()
+    choice_max = max(chain(*choice_histograms.values()), default=0)
+    for idx, (course, hist) in enumerate(choice_histograms.items()):
+        data = pd.DataFrame({
+            "x": CHOICE_LABELS[:CHOICE_LIMIT],
+            "y": hist
+        })
+        # plot histogram of top 5 choices
+        sns.barplot(x="x", y="y", data=data, ax=axes[idx])
+        axes[idx].set_title(course)
+        axes[idx].set_xlabel("")
+        axes[idx].set_ylabel("")
+        axes[idx].set_ylim(0,max(choice_max,1))
+    for ax in axes[n_courses:]:
+        ax.set_visible(False)
+    fig.savefig(coursehist_file)
+    plt.close(fig)
+
+    h = summary["happiness"]
+    fig = plt.figure()
+    sns.histplot(
+        h,
+        bins=max(int(h.max()-h.min()), 1)
+    )
+    plt.xlabel("happiness")
+    plt.ylabel("N students")
+    fig.savefig(happiness_file)
+    plt.close(fig)
+
+def start_rendering(summary):
+    # draw charts in their own session with no handle on our stdout/stderr,
+    # so callers piping or capturing our output don't wait for them;
+    # rendering errors go to CHARTS_LOG
+    try:
+        with open(CHARTS_LOG, "w") as log:
+            process = subprocess.Popen(
+                [sys.executable, __file__],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=log,
+                start_new_session=True,
+            )
+        pickle.dump(summary, process.stdin)
+        process.stdin.close()
+        if hasattr(os, "fork"):
+            # the render process forks once it has the summary and the
+            # half we started exits straight away, so this doesn't block
+            if process.wait() != 0:
+                print(f"chart rendering failed to start, see {CHARTS_LOG}", file=sys.stderr)
+    except OSError as e:
+        print(f"couldn't start chart rendering: {e}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # render process: summary arrives pickled on stdin, stderr is CHARTS_LOG
+    summary = pickle.load(sys.stdin.buffer)
+    if hasattr(os, "fork") and os.fork():
+        os._exit(0)
+    try:
+        render_charts(summary)
+    except Exception:
+        traceback.print_exc()
+        print("chart rendering failed, data outputs are unaffected", file=sys.stderr)
+        sys.exit(1)
@@ -1,8 +1,5 @@
 from collections import Counter, deque
-from itertools import chain
 from random import shuffle, choice
-from matplotlib import pyplot as plt
-import seaborn as sns
 import sys
 
 import argparse
@@ -10,6 +7,8 @@ import argparse
 import numpy as np
 import pandas as pd
 
+from charts import chart_summary, start_rendering
+
 PREF_POINTS = {
     1: 25,
     2: 18,
@@ -195,37 +194,13 @@ def gotnreport(students, _prefnumbers, max_got):
         for m in range(max_got,0,-1)
     }
 
-def choicehist(students, course, limit):
-    # how many students had this course as their 1st, 2nd, 3rd choice?
-    return [
-        (students[course] == rank).sum()
-        for rank in range(1,limit+1)
-    ]
-
 def report(students, courses, bump, out_file):
     course_ids = set(courses.index)
 
-    limit = 5
-    xlabels = ["1st","2nd","3rd","4th","5th"]
-    fig, axes = plt.subplots(4,4,figsize=(20,20))
-    axes=axes.flatten()
-    choice_histograms = {
-        course: choicehist(students, course, limit)
-        for course in course_ids
-    }
-    choice_max = max(chain(*choice_histograms.values()))
-    for idx, course in enumerate(course_ids):
-        data = pd.DataFrame({
-            "x": xlabels,
-            "y": choice_histograms[course]
-        })
-        # plot histogram of top 5 choices
-        sns.barplot(x="x", y="y", data=data, ax=axes[idx])
-        axes[idx].set_title(course)
-        axes[idx].set_xlabel("")
-        axes[idx].set_ylabel("")
-        axes[idx].set_ylim(0,choice_max)
-    fig.savefig("coursehist.png")
+    # charts are drawn in the background, data outputs don't wait for them
+    start_rendering(chart_summary(students, courses))
+
+    students.to_csv(out_file)
 
     report_file = open("report.txt","w")
     def report(t):
@@ -275,8 +250,6 @@ def report(students, courses, bump, out_file):
         )
     )
 
-    students.to_csv(out_file)
-
     report(
         "got N of pref 10 or lower: "
         +', '.join(
@@ -297,13 +270,6 @@ def report(students, courses, bump, out_file):
     report(
         f"Happiness mean {h.mean():.1f}, std {h.std():.1f}, (min, max) ({h.min()}, {h.max()})"
     )
-    f = plt.figure()
-    sns.distplot(
-        students["happiness"],
-        bins=h.max()-h.min(),
-        kde=False
-    )
-
     report(
         "Students with incomplete allocations:\n"
         +"\n".join(students[students["ncourses"] != students["allocated"]].index)
@@ -323,34 +289,33 @@ def report(students, courses, bump, out_file):
         +"\n\n"
     )
 
-    plt.xlabel("happiness")
-    plt.ylabel("N students")
-    plt.savefig("happiness.png")
-
-
-parser = argparse.ArgumentParser(
-    description="Heuristic course allocator for 3rd and 4th year Psychology courses"
-)
-parser.add_argument("--students", required=True)
-parser.add_argument("--courses", required=True)
-parser.add_argument("--coursegroups", required=True)
-parser.add_argument("--out", required=True)
-args = vars(parser.parse_args())
-
-
-data = load_and_prepare(
-    args["students"],
-    args["courses"],
-    args["coursegroups"]
-)
-students, courses, groups, coursegroups = (
-    data["students"],
-    data["courses"],
-    data["groups"],
-    data["coursegroups"]
-)
-
-# do allocation
-students, courses, bump = alloc1(students, courses, groups, coursegroups)
-students = courseformat(students)
-report(students, courses, bump, args["out"])
+    report_file.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Heuristic course allocator for 3rd and 4th year Psychology courses"
+    )
+    parser.add_argument("--students", required=True)
+    parser.add_argument("--courses", required=True)
+    parser.add_argument("--coursegroups", required=True)
+    parser.add_argument("--out", required=True)
+    args = vars(parser.parse_args())
+
+
+    data = load_and_prepare(
+        args["students"],
+        args["courses"],
+        args["coursegroups"]
+    )
+    students, courses, groups, coursegroups = (
+        data["students"],
+        data["courses"],
+        data["groups"],
+        data["coursegroups"]
+    )
+
+    # do allocation
+    students, courses, bump = alloc1(students, courses, groups, coursegroups)
+    students = courseformat(students)
+    report(students, courses, bump, args["out"])
@@ -0,0 +1,149 @@
+import re
+import sys
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ALLOC_COL_RE = r"courses\d+$"
+
+def load_allocation(out_file, course_ids):
+    # only read the columns we check, the --out CSV carries a lot more
+    wanted = {"name", "year", "ncourses", "sem1limit", "sem2limit"}
+    wanted |= set(course_ids)
+    header = pd.read_csv(out_file, nrows=0).columns
+    alloc_cols = sorted(
+        (c for c in header if re.match(ALLOC_COL_RE, c)),
+        key=lambda c: int(c[7:])
+    )
+    # text columns blank to "", numeric ones (ranks, limits) stay numbers
+    text_cols = ["year"] + alloc_cols
+    students = pd.read_csv(
+        out_file,
+        index_col="name",
+        usecols=[c for c in header if c in wanted] + alloc_cols,
+        dtype={c: str for c in text_cols},
+    )
+    students[text_cols] = students[text_cols].fillna("")
+    return students, alloc_cols
+
+def load_held_groups(student_file, group_ids):
+    # groups each student held before allocation; the allocator overwrites
+    # these columns in --out, so they have to come from the input file
+    return pd.read_csv(
+        student_file,
+        index_col="name",
+        usecols=["name"] + sorted(group_ids),
+    )
+
+def allocation_matrix(students, alloc_cols, course_ids):
+    # students x courses count of times each course was given,
+    # plus (row, name) of anything given that isn't in the course file
+    n_students, n_courses = students.shape[0], len(course_ids)
+    given = students.loc[:, alloc_cols].to_numpy(dtype=object)
+    codes = pd.Index(course_ids).get_indexer(given.ravel())
+    codes = codes.reshape(given.shape)
+    counts = np.zeros((n_students, n_courses), dtype=int)
+    rows, cols = np.nonzero(codes >= 0)
+    np.add.at(counts, (rows, codes[rows, cols]), 1)
+    unknown_rows, unknown_cols = np.nonzero((codes < 0) & (given != ""))
+    unknown = (unknown_rows, given[unknown_rows, unknown_cols])
+    return counts, unknown
+
+def validate(students, alloc_cols, held_before, courses, coursegroups):
+    course_ids = list(courses.index)
+    group_ids = sorted(set(coursegroups["group"]))
+    student_ids = students.index.to_numpy()
+    course_arr = np.array(course_ids, dtype=object)
+
+    counts, (unknown_rows, unknown_names) = allocation_matrix(
+        students, alloc_cols, course_ids
+    )
+    got = counts > 0
+
+    violations = []
+    def flag(rows, names, rule):
+        violations.append(pd.DataFrame({
+            "student": student_ids[rows] if rows is not None else "",
+            "course": names,
+            "rule": rule,
+        }))
+
+    flag(unknown_rows, unknown_names, "unknown course")
+
+    # students listed twice, or not matching exactly one student file row
+    rows = np.nonzero(students.index.duplicated())[0]
+    flag(rows, "", "duplicate student")
+    held_dup = held_before.index.duplicated(keep=False)
+    dup_input = students.index.isin(held_before.index[held_dup])
+    flag(np.nonzero(dup_input)[0], "", "duplicate in student file")
+    held_before = held_before.loc[~held_dup, :]
+    in_input = students.index.isin(held_before.index)
+    rows = np.nonzero(~in_input & ~dup_input)[0]
+    flag(rows, "", "student not in student file")
+
+    rows, cols = np.nonzero(counts > 1)
+    flag(rows, course_arr[cols], "duplicate course")
+
+    # course capacity
+    over = got.sum(axis=0) > courses["capacity"].to_numpy()
+    flag(None, course_arr[over], "over capacity")
+
+    # semester limits, course column blank as the limit is per student
+    semester = courses["semester"].to_numpy()
+    for sem in (1, 2):
+        per_sem = got[:, semester == sem].sum(axis=1)
+        rows = np.nonzero(per_sem > students[f"sem{sem}limit"].to_numpy())[0]
+        flag(rows, "", f"sem{sem}limit exceeded")
+
+    # ncourses met
+    n_got = got.sum(axis=1)
+    rows = np.nonzero(n_got != students["ncourses"].to_numpy())[0]
+    flag(rows, "", "ncourses not met")
+
+    # given a course the student did not rank (unranked prefs are 0)
+    ranks = students.loc[:, course_ids].to_numpy(dtype=float)
+    rows, cols = np.nonzero(got & ~(ranks > 0))
+    flag(rows, course_arr[cols], "course not ranked")
+
+    # Y4 group coverage: groups held before allocation, or from a course given
+    in_group = np.zeros((len(course_ids), len(group_ids)), dtype=bool)
+    cg = coursegroups.loc[coursegroups["course"].isin(course_ids), :]
+    in_group[
+        pd.Index(course_ids).get_indexer(cg["course"]),
+        pd.Index(group_ids).get_indexer(cg["group"])
+    ] = True
+    held = held_before.reindex(students.index).loc[:, group_ids]
+    held = held.fillna(False).to_numpy(dtype=bool)
+    covered = held | (got.astype(int) @ in_group.astype(int) > 0)
+    # students not matched in the student file are already flagged above
+    y4 = (students["year"] == "Y4").to_numpy() & in_input
+    rows, cols = np.nonzero(y4[:, None] & ~covered)
+    missing = np.array(group_ids, dtype=object)[cols]
+    flag(rows, "", "Y4 group not covered: " + missing)
+
+    return pd.concat(violations, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check an allocation CSV written by heuristic_allocator.py --out"
+    )
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--students", required=True)
+    parser.add_argument("--courses", required=True)
+    parser.add_argument("--coursegroups", required=True)
+    args = vars(parser.parse_args())
+
+    courses = pd.read_csv(args["courses"], index_col="name")
+    coursegroups = pd.read_csv(args["coursegroups"])
+    students, alloc_cols = load_allocation(args["out"], courses.index)
+    held_before = load_held_groups(args["students"], set(coursegroups["group"]))
+
+    violations = validate(students, alloc_cols, held_before, courses, coursegroups)
+    if violations.shape[0]:
+        print(violations.to_string(index=False))
+        print(f"{violations.shape[0]} violations")
+        sys.exit(1)
+    print(f"OK: {students.shape[0]} students, {courses.shape[0]} courses")